@@ -1,27 +1,68 @@
 #!/usr/bin/env python3
 
 import re
+import sys
+from bisect import bisect_left
+from functools import lru_cache
 from pathlib import Path
 import pandas as pd
 from lxml import etree
+from openpyxl import Workbook
 
-# —— Natural sort helpers (handle [idx] and .bit) ——
+# Fast Rust-backed Excel reader when available (pandas >= 2.2), else openpyxl
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_READ_ENGINE = "calamine"
+except ImportError:
+    EXCEL_READ_ENGINE = "openpyxl"
+
+# —— Tag name helpers (handle [idx] and .bit) ——
 _tag_pat = re.compile(r'^(.*?)(?:\[(\d+)\])?(?:\.(\d+))?$')
-def tag_sort_key(tag: str):
+# Cached: the same tags are parsed again for indexing, expansion and the final sort
+@lru_cache(maxsize=None)
+def parse_tag(tag: str):
+    """Return (base, idx, bit) from one regex match; idx/bit are -1 if absent."""
     m = _tag_pat.match(tag or "")
-    base = m.group(1) if m else tag
-    idx  = int(m.group(2)) if m and m.group(2) is not None else -1
-    bit  = int(m.group(3)) if m and m.group(3) is not None else -1
-    return (base, idx, bit)
+    if not m:
+        return (tag, -1, -1)
+    return (m.group(1), int(m.group(2) or -1), int(m.group(3) or -1))
+
+# Natural sort key (shares parse_tag's cache)
+tag_sort_key = parse_tag
 
-def split_index(tag: str):
-    """Return (base, idx) where idx defaults to 0 if absent."""
-    m = re.match(r'^(.+?)\[(\d+)\]$', tag)
-    return (m.group(1), int(m.group(2))) if m else (tag, 0)
+def split_index(tag: str, default_idx: int = 0):
+    """Return (base, idx) for a trailing [idx]; otherwise (tag, default_idx)."""
+    base, idx, bit = parse_tag(tag)
+    return (base, idx) if base and idx >= 0 and bit < 0 else (tag, default_idx)
 
 def strip_index(tag: str):
     """Return base name with any [idx] removed."""
-    return re.sub(r'\[\d+\]$', '', tag)
+    i = tag.rfind("[")
+    return tag[:i] if i >= 0 and tag.endswith("]") else tag
+
+# —— Rung text instructions, one alternation so each rung is scanned once ——
+_instr_re = re.compile(
+    r'\b(?:'
+    r'(?P<cop>COP|CPS)\s*\(\s*'             # COP/CPS(Source, Dest, Length)
+    r'(?P<cop_src>[^,\s\)]+)\s*,\s*'        #   Source (maybe with [i])
+    r'(?P<cop_dst>[^,\s\)]+)\s*,\s*'        #   Dest   (maybe with [i])
+    r'(?P<cop_len>\d+)\s*\)'                #   Length
+    r'|MOV\s*\(\s*'                         # MOV(Source, Dest)
+    r'(?P<mov_src>[^,\s\)]+)\s*,\s*'
+    r'(?P<mov_dst>[^,\s\)]+)\s*\)'
+    r'|FFL\s*\(\s*'                         # FFL(Source, Dest, Control, ...)
+    r'(?P<ffl_src>[^,\s\)]+)\s*,\s*'
+    r'(?P<ffl_dst>[^,\s\)]+)\s*,\s*'
+    r'(?P<ffl_ctl>[^,\s\)]+)'
+    r'|OTE\s*\(\s*(?P<ote>[^\s\)]+)\s*\)'   # OTE(operand)
+    r')',
+    re.IGNORECASE
+)
+
+_instr_kw_re = re.compile(r'COP|CPS|MOV|FFL|OTE', re.IGNORECASE)
+
+# —— Pre-compiled XPath (avoids re-parsing the expression per Tag) ——
+_control_len_xp = etree.XPath(".//DataValueMember[@Name='LEN']/@Value")
 
 # ————— Configure your paths here —————
 SCRIPT_DIR  = Path(__file__).resolve().parent
@@ -39,231 +80,222 @@ def extract_mappings(excel_path: Path, l5x_path: Path, output_path: Path):
             raise FileNotFoundError(f"{label} file not found or not a file: {p}")
 
     # 1) Load Excel tags; keep both a set and a natural-sorted list
-    df_tags = pd.read_excel(excel_path, engine="openpyxl")
+    #    (only Col45 is used, so skip parsing every other column)
+    df_tags = pd.read_excel(excel_path, engine=EXCEL_READ_ENGINE, usecols=lambda c: c == "Col45")
     if "Col45" not in df_tags.columns:
-        raise KeyError(f"'Col45' column not found. Available: {df_tags.columns.tolist()}")
-    dest_tags_set = set(df_tags["Col45"].dropna().astype(str))
+        available = pd.read_excel(excel_path, engine=EXCEL_READ_ENGINE, nrows=0).columns.tolist()
+        raise KeyError(f"'Col45' column not found. Available: {available}")
+    dest_tags_set = frozenset(sys.intern(t) for t in df_tags["Col45"].dropna().astype(str))
     tags_sorted   = sorted(dest_tags_set, key=tag_sort_key)
 
-    # 2) Parse the L5X once
-    parser = etree.XMLParser(remove_comments=False, recover=True)
-    tree   = etree.parse(str(l5x_path), parser)
-    root   = tree.getroot()
-
-    # 3) Build maps: DataType, base Description, bit comments from Tag definitions, CONTROL LEN
+    # Per-array sorted indices of "Base[idx]" tags, so COP/FFL/MSG expansions only
+    # visit indices that are actually in the list instead of probing every k
+    # (tags_sorted is natural-sorted, so each list comes out ascending)
+    dest_by_base = {}
+    for t in tags_sorted:
+        base, idx, _ = parse_tag(t)
+        if idx >= 0 and t == f"{base}[{idx}]":
+            dest_by_base.setdefault(base, []).append(idx)
+
+    def dest_indices(base, start, length):
+        """Listed indices of base within [start, start + length), ascending."""
+        idxs = dest_by_base.get(base, ())
+        return idxs[bisect_left(idxs, start):bisect_left(idxs, start + length)]
+
+    # 2) Maps: DataType, base Description, bit comments from Tag definitions, CONTROL LEN
     dtype_map = {}
     base_desc_map = {}
     bit_comment_map = {}   # key: "Base[idx].bit" -> comment text
     control_len_map = {}   # key: control tag name -> LEN (int)
 
-    for t in root.findall(".//Tag"):
-        base_name = t.get("Name")
-        if not base_name:
+    # 3) Rung results: direct mappings + OTE operand index.
+    #    Output rows are kept column-wise (one list per column) rather than as per-row dicts,
+    #    and duplicates are dropped as they arrive instead of in a pass over the DataFrame.
+    cols = ["Col45","Description","DataType","Program","Routine","Rung","Instruction","Source"]
+    c_col45, c_desc, c_dt, c_prog, c_rout, c_rung, c_instr, c_src = [], [], [], [], [], [], [], []
+    seen = set()
+
+    def add_record(col45, desc, dt, prog, rout, rung, instr, src):
+        key = (col45, desc, dt, prog, rout, rung, instr, src)
+        if key in seen:
+            return
+        seen.add(key)
+        c_col45.append(col45)
+        c_desc.append(desc)
+        c_dt.append(dt)
+        c_prog.append(prog)
+        c_rout.append(rout)
+        c_rung.append(rung)
+        c_instr.append(instr)
+        c_src.append(src)
+
+    found_original_tags = set()   # items exactly as in Col45 (e.g., "X[7]") that we've mapped
+    bit_ote = {}                  # (base, idx) -> {bit: (Program, Routine, Rung) of first OTE}
+    rung_hits = []                # (instr, dst_base, dst_k, src, Program, Routine, Rung, ffl) in document order
+
+    # 4-5) Stream the L5X once. Rungs can come before the Tags they use (Add-On
+    #    Instruction logic precedes the controller Tags), so rung hits only record
+    #    what the rung says; DataType, Description and FFL LEN are resolved after the pass.
+    prog_name = rout_name = None
+    context = etree.iterparse(
+        str(l5x_path), events=("start", "end"), tag=("Tag", "Rung", "Routine", "Program"),
+        remove_comments=False, huge_tree=True, recover=True,
+    )
+    for event, elem in context:
+        if event == "start":
+            if elem.tag == "Routine":
+                # context (Routine -> Routines -> Program), cached for its rungs
+                rout_name = elem.get("Name")
+                prog_name = elem.getparent().getparent().get("Name")
             continue
 
-        dt = (t.get("DataType") or "").upper()
-        if dt:
-            dtype_map[base_name] = dt
-
-        desc_el = t.find("Description")
-        if desc_el is not None:
-            base_desc = (desc_el.get("Text") or desc_el.text or "").strip()
-            if base_desc:
-                base_desc_map[base_name] = base_desc
-
-        # Bit-level comments: <Comments><Comment Operand="[i].bit">text</Comment>
-        comments_el = t.find("Comments")
-        if comments_el is not None:
-            for c in comments_el.findall("Comment"):
-                operand = (c.get("Operand") or "").strip()
+        if elem.tag == "Tag":
+            t = elem
+            base_name = t.get("Name")
+            if base_name:
+                dt = (t.get("DataType") or "").upper()
+                if dt:
+                    dtype_map[base_name] = sys.intern(dt)
+
+                desc_el = t.find("Description")
+                if desc_el is not None:
+                    base_desc = (desc_el.get("Text") or desc_el.text or "").strip()
+                    if base_desc:
+                        base_desc_map[base_name] = base_desc
+
+                # Bit-level comments: <Comments><Comment Operand="[i].bit">text</Comment>
+                comments_el = t.find("Comments")
+                if comments_el is not None:
+                    for c in comments_el.findall("Comment"):
+                        operand = (c.get("Operand") or "").strip()
+                        if not operand:
+                            continue
+                        text = (c.get("Text") or c.text or "").strip()
+                        if not text:
+                            continue
+                        key = f"{base_name}{operand}" if operand.startswith("[") else operand
+                        bit_comment_map[key] = text
+
+                # CONTROL LEN
+                if dt == "CONTROL":
+                    vals = _control_len_xp(t)
+                    if vals:
+                        try:
+                            control_len_map[base_name] = int(vals[0])
+                        except ValueError:
+                            pass  # leave missing if not parseable
+
+        elif elem.tag == "Rung":
+            rung     = elem
+            rung_num = rung.get("Number")
+
+            text_el = rung.find("Text")
+            txt = text_el.text if (text_el is not None and text_el.text) else ""
+
+            # Also scan structured rung XML for bit comments tied directly to operands (keep if tag-level missing)
+            for op_elem in rung.iter():
+                operand = (op_elem.get("Operand") or "").strip()
                 if not operand:
                     continue
-                text = (c.get("Text") or c.text or "").strip()
-                if not text:
+                com = op_elem.find("Comment")
+                if com is not None:
+                    ctext = (com.get("Text") or com.text or "").strip()
+                    if ctext and operand not in bit_comment_map:
+                        bit_comment_map[operand] = ctext
+
+            # COP/CPS, MOV, FFL and OTE in one left-to-right scan of the rung text;
+            # lastgroup names the final field of whichever instruction matched.
+            # Most rungs use none of them, so a cheap keyword probe gates the scan.
+            instr_hits = _instr_re.finditer(txt) if _instr_kw_re.search(txt) else ()
+            for m in instr_hits:
+                kind = m.lastgroup
+
+                if kind == "ote":
+                    # Track OTE operands present on this rung (for existence / context)
+                    operand = m.group("ote").strip()
+                    if operand:
+                        # Indexed by (base, idx) so the bit sweep needs one lookup per tag
+                        base, idx, bit = parse_tag(operand)
+                        if idx >= 0 and bit >= 0 and operand == f"{base}[{idx}].{bit}":
+                            bit_ote.setdefault((base, idx), {}).setdefault(bit, (prog_name, rout_name, rung_num))
+
+                elif kind == "cop_len":
+                    # COP/CPS (expand by length)
+                    instr, src_full, dst_full, length_s = m.group("cop", "cop_src", "cop_dst", "cop_len")
+                    length = int(length_s)
+                    src_base, src_i0 = split_index(src_full)
+                    dst_base, dst_i0 = split_index(dst_full)
+                    hits = dest_indices(dst_base, dst_i0, length)
+                    if not hits:
+                        continue
+
+                    instr = sys.intern(instr.upper())
+                    for idx in hits:
+                        src_k = f"{src_base}[{src_i0 + idx - dst_i0}]"
+                        rung_hits.append((instr, dst_base, f"{dst_base}[{idx}]", src_k, prog_name, rout_name, rung_num, None))
+
+                elif kind == "mov_dst":
+                    # MOV (no length)
+                    src_full, dst_full = m.group("mov_src", "mov_dst")
+                    if dst_full in dest_tags_set:
+                        dst_base, _ = split_index(dst_full)
+                        rung_hits.append(("MOV", dst_base, dst_full, src_full, prog_name, rout_name, rung_num, None))
+
+                elif kind == "ffl_ctl":
+                    # FFL: destination is expanded by the control tag's LEN once all Tags are known
+                    src_full, dst_full, ctl_full = m.group("ffl_src", "ffl_dst", "ffl_ctl")
+                    dst_base, dst_i0 = split_index(dst_full)
+                    if dst_base in dest_by_base:
+                        # Source is typically scalar; keep as-is
+                        rung_hits.append(("FFL", dst_base, None, src_full, prog_name, rout_name, rung_num,
+                                          (dst_i0, strip_index(ctl_full))))
+
+            # MessageParameters (length via RequestedLength)
+            for mp in rung.iter("MessageParameters"):
+                local_elem    = mp.get("LocalElement")
+                req_len       = mp.get("RequestedLength")
+                local_index_s = mp.get("LocalIndex", "0")
+                remote_elem   = mp.get("RemoteElement")
+                if not local_elem or not req_len:
                     continue
-                key = f"{base_name}{operand}" if operand.startswith("[") else operand
-                bit_comment_map[key] = text
-
-        # CONTROL LEN
-        if dt == "CONTROL":
-            len_el = t.find(".//DataValueMember[@Name='LEN']")
-            if len_el is not None:
-                val = len_el.get("Value")
-                try:
-                    control_len_map[base_name] = int(val)
-                except (TypeError, ValueError):
-                    pass  # leave missing if not parseable
-
-    # 4) Prepare regexes
-    cop_re = re.compile(
-        r'\b(COP|CPS)\s*\(\s*'      # Instruction
-        r'([^,\s\)]+)\s*,\s*'       # Source (maybe with [i])
-        r'([^,\s\)]+)\s*,\s*'       # Dest   (maybe with [i])
-        r'(\d+)\s*\)',              # Length
-        re.IGNORECASE
-    )
-    mov_re = re.compile(
-        r'\bMOV\s*\(\s*'
-        r'([^,\s\)]+)\s*,\s*'       # Source
-        r'([^,\s\)]+)\s*\)',        # Destination
-        re.IGNORECASE
-    )
-    ffl_re = re.compile(           # FFL(Source, Dest, Control, ...)
-        r'\bFFL\s*\(\s*'
-        r'([^,\s\)]+)\s*,\s*'       # Source
-        r'([^,\s\)]+)\s*,\s*'       # Dest
-        r'([^,\s\)]+)',             # Control
-        re.IGNORECASE
-    )
-    ote_text_re = re.compile(
-        r'\bOTE\s*\(\s*([^\s\)]+)\s*\)',  # OTE(operand) from rung text
-        re.IGNORECASE
-    )
 
-    # 5) Walk every Rung; collect direct mappings + OTE operand index (and rung-level bit comments if present)
-    records = []
-    found_original_tags = set()   # items exactly as in Col45 (e.g., "X[7]") that we've mapped
-    ote_map = {}                  # operand -> list of (Program, Routine, Rung)
-
-    for rung in root.findall(".//Rung"):
-        # context
-        rll       = rung.getparent()
-        rout      = rll.getparent()
-        progs     = rout.getparent()
-        prog      = progs.getparent()
-        prog_name = prog.get("Name")
-        rout_name = rout.get("Name")
-        rung_num  = rung.get("Number")
-
-        text_el = rung.find("Text")
-        txt = text_el.text if (text_el is not None and text_el.text) else ""
-
-        # Track OTE operands present on this rung (for existence / context)
-        for operand in ote_text_re.findall(txt):
-            operand = operand.strip()
-            if operand:
-                ote_map.setdefault(operand, []).append((prog_name, rout_name, rung_num))
-
-        # Also scan structured rung XML for bit comments tied directly to operands (keep if tag-level missing)
-        for elem in rung.findall(".//*[@Operand]"):
-            operand = (elem.get("Operand") or "").strip()
-            if not operand:
-                continue
-            com = elem.find("Comment")
-            if com is not None:
-                ctext = (com.get("Text") or com.text or "").strip()
-                if ctext and operand not in bit_comment_map:
-                    bit_comment_map[operand] = ctext
-
-        # COP/CPS (expand by length)
-        for instr, src_full, dst_full, length_s in cop_re.findall(txt):
-            length = int(length_s)
-            src_base, src_i0 = split_index(src_full)
-            dst_base, dst_i0 = split_index(dst_full)
-            dt = dtype_map.get(dst_base, "")
-            base_desc = base_desc_map.get(dst_base, "")
-
-            for k in range(length):
-                dst_k = f"{dst_base}[{dst_i0 + k}]"
-                if dst_k in dest_tags_set:
-                    src_k = f"{src_base}[{src_i0 + k}]"
-                    records.append({
-                        "Col45":       dst_k,
-                        "Description": base_desc,
-                        "DataType":    dt,
-                        "Program":     prog_name,
-                        "Routine":     rout_name,
-                        "Rung":        rung_num,
-                        "Instruction": instr.upper(),
-                        "Source":      src_k,
-                    })
-                    found_original_tags.add(dst_k)
-
-        # MOV (no length)
-        for src_full, dst_full in mov_re.findall(txt):
-            if dst_full in dest_tags_set:
-                dst_base, _ = split_index(dst_full)
-                dt = dtype_map.get(dst_base, "")
-                base_desc = base_desc_map.get(dst_base, "")
-                records.append({
-                    "Col45":       dst_full,
-                    "Description": base_desc,
-                    "DataType":    dt,
-                    "Program":     prog_name,
-                    "Routine":     rout_name,
-                    "Rung":        rung_num,
-                    "Instruction": "MOV",
-                    "Source":      src_full,
-                })
-                found_original_tags.add(dst_full)
-
-        # FFL: expand destination using LEN from control tag
-        for src_full, dst_full, ctl_full in ffl_re.findall(txt):
-            ctl_base = strip_index(ctl_full)
-            ffl_len  = control_len_map.get(ctl_base)
+                length      = int(req_len)
+                local_index = int(local_index_s)
+
+                dst_base, dst_i0 = split_index(local_elem, local_index)
+                hits = dest_indices(dst_base, dst_i0, length)
+                if not hits:
+                    continue
+
+                src_base, src_i0 = split_index(remote_elem or "", local_index)
+
+                for idx in hits:
+                    src_k = f"{src_base}[{src_i0 + idx - dst_i0}]"
+                    rung_hits.append(("MESSAGE", dst_base, f"{dst_base}[{idx}]", src_k, prog_name, rout_name, rung_num, None))
+
+        # Free what has been handled: Tags, Rungs and finished Routines/Programs are
+        # released as they close (DataTypes, Modules, AOI Parameters/LocalTags and
+        # Tasks are not matched here and stay in the tree)
+        elem.clear(keep_tail=True)
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+
+    # 5b) Turn rung hits into rows now that every Tag has been seen
+    for instr, dst_base, dst_k, src, prog, rout, rung_num, ffl in rung_hits:
+        if ffl is None:
+            dst_ks = (dst_k,)
+        else:
+            dst_i0, ctl_base = ffl
+            ffl_len = control_len_map.get(ctl_base)
             if not ffl_len:
                 continue  # can't expand without LEN
-            dst_base, dst_i0 = split_index(dst_full)
-            dt = dtype_map.get(dst_base, "")
-            base_desc = base_desc_map.get(dst_base, "")
-
-            for k in range(ffl_len):
-                dst_k = f"{dst_base}[{dst_i0 + k}]"
-                if dst_k in dest_tags_set:
-                    # Source is typically scalar; keep as-is
-                    records.append({
-                        "Col45":       dst_k,
-                        "Description": base_desc,
-                        "DataType":    dt,
-                        "Program":     prog_name,
-                        "Routine":     rout_name,
-                        "Rung":        rung_num,
-                        "Instruction": "FFL",
-                        "Source":      src_full,
-                    })
-                    found_original_tags.add(dst_k)
-
-        # MessageParameters (length via RequestedLength)
-        for mp in rung.findall(".//MessageParameters"):
-            local_elem    = mp.get("LocalElement")
-            req_len       = mp.get("RequestedLength")
-            local_index_s = mp.get("LocalIndex", "0")
-            remote_elem   = mp.get("RemoteElement")
-            if not local_elem or not req_len:
-                continue
-
-            length      = int(req_len)
-            local_index = int(local_index_s)
-
-            m = re.match(r'^(.+?)\[(\d+)\]$', local_elem)
-            if m:
-                dst_base, dst_i0 = m.group(1), int(m.group(2))
-            else:
-                dst_base, dst_i0 = local_elem, local_index
-            dt = dtype_map.get(dst_base, "")
-            base_desc = base_desc_map.get(dst_base, "")
-
-            m2 = re.match(r'^(.+?)\[(\d+)\]$', remote_elem or "")
-            if m2:
-                src_base, src_i0 = m2.group(1), int(m2.group(2))
-            else:
-                src_base, src_i0 = (remote_elem or ""), local_index
-
-            for k in range(length):
-                dst_k = f"{dst_base}[{dst_i0 + k}]"
-                if dst_k in dest_tags_set:
-                    src_k = f"{src_base}[{src_i0 + k}]"
-                    records.append({
-                        "Col45":       dst_k,
-                        "Description": base_desc,
-                        "DataType":    dt,
-                        "Program":     prog_name,
-                        "Routine":     rout_name,
-                        "Rung":        rung_num,
-                        "Instruction": "MESSAGE",
-                        "Source":      src_k,
-                    })
-                    found_original_tags.add(dst_k)
+            dst_ks = [f"{dst_base}[{idx}]" for idx in dest_indices(dst_base, dst_i0, ffl_len)]
+
+        dt = dtype_map.get(dst_base, "")
+        base_desc = base_desc_map.get(dst_base, "")
+        for dst_k in dst_ks:
+            add_record(dst_k, base_desc, dt, prog, rout, rung_num, instr, src)
+            found_original_tags.add(dst_k)
 
     # 6) Bitwise OTE sweep: only emit bits that actually have an OTE
     for orig in tags_sorted:
@@ -275,29 +307,22 @@ def extract_mappings(excel_path: Path, l5x_path: Path, output_path: Path):
         if dt not in ("INT", "DINT"):
             continue
 
+        bits = bit_ote.get((base, idx))
+        if not bits:
+            continue  # only add bits with OTE
+
         max_bit   = 15 if dt == "INT" else 31
         base_desc = base_desc_map.get(base, "")
         emitted   = False
 
-        for bit in range(max_bit + 1):
+        for bit in sorted(bits):
+            if bit > max_bit:
+                break
             operand = f"{base}[{idx}].{bit}"
-            ctx = ote_map.get(operand)
-            if not ctx:
-                continue  # only add bits with OTE
-
             descr = bit_comment_map.get(operand, base_desc)
-            prog_name, rout_name, rung_num = ctx[0]
-
-            records.append({
-                "Col45":       operand,
-                "Description": descr,
-                "DataType":    dt,
-                "Program":     prog_name,
-                "Routine":     rout_name,
-                "Rung":        rung_num,
-                "Instruction": "OTE",
-                "Source":      "",
-            })
+            prog_name, rout_name, rung_num = bits[bit]
+
+            add_record(operand, descr, dt, prog_name, rout_name, rung_num, "OTE", "")
             emitted = True
 
         if emitted:
@@ -309,30 +334,32 @@ def extract_mappings(excel_path: Path, l5x_path: Path, output_path: Path):
             base, _ = split_index(tag)
             dt = dtype_map.get(base, "")
             base_desc = base_desc_map.get(base, "")
-            records.append({
-                "Col45":       tag,
-                "Description": base_desc,
-                "DataType":    dt,
-                "Program":     "",
-                "Routine":     "",
-                "Rung":        "",
-                "Instruction": "Not Found",
-                "Source":      "",
-            })
-
-    # 8) De-dup and natural-sort the entire output by Col45 (handles [i] and .bit)
-    cols  = ["Col45","Description","DataType","Program","Routine","Rung","Instruction","Source"]
-    df_out = pd.DataFrame(records, columns=cols).drop_duplicates()
-
-    tmp = df_out["Col45"].str.extract(r'^(.*?)(?:\[(\d+)\])?(?:\.(\d+))?$')
-    df_out["__base"] = tmp[0]
-    df_out["__idx"]  = tmp[1].fillna(-1).astype(int)
-    df_out["__bit"]  = tmp[2].fillna(-1).astype(int)
-    df_out = df_out.sort_values(["__base","__idx","__bit"]).drop(columns=["__base","__idx","__bit"])
-
-    # 9) Write to Excel
-    with pd.ExcelWriter(output_path, engine="openpyxl") as w:
-        df_out.to_excel(w, index=False, sheet_name="Tag Mapping")
+            add_record(tag, base_desc, dt, "", "", "", "Not Found", "")
+
+    # 8) Natural-sort the entire output by Col45 (handles [i] and .bit)
+    df_out = pd.DataFrame(
+        dict(zip(cols, (c_col45, c_desc, c_dt, c_prog, c_rout, c_rung, c_instr, c_src))),
+        columns=cols, copy=False,
+    )
+
+    # Few distinct values in these columns; categoricals store them as small integer codes.
+    # (Missing names become "" first, so no NaN reaches the worksheet.)
+    for col in ("DataType", "Instruction", "Program", "Routine"):
+        df_out[col] = df_out[col].fillna("").astype("category")
+
+    # (base, idx, bit) keys from the compiled pattern; stable sort, so rows with the
+    # same Col45 keep their insertion order
+    keys  = [tag_sort_key(t) for t in df_out["Col45"]]
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    df_out = df_out.iloc[order]
+
+    # 9) Write to Excel (write-only workbook streams rows instead of holding every cell)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Tag Mapping")
+    ws.append(cols)
+    for row in df_out.itertuples(index=False, name=None):
+        ws.append(row)
+    wb.save(output_path)
 
     print(f"✅  Wrote {len(df_out)} rows to '{output_path}'")
 
@@ -18,19 +18,11 @@ def main():
     if not INPUT_FILE.is_file():
         sys.exit(f"❌ Input file not found:\n   {INPUT_FILE}")
 
-    matches = []
     with INPUT_FILE.open(newline='', encoding='utf-8', errors='replace') as f:
-        reader = csv.reader(f)
-        for row in reader:
-            # skip empty or section‐header lines
-            if not row or row[0].startswith(':'):
-                continue
-            # need at least two columns
-            if len(row) < 2:
-                continue
-            # exact match on column B
-            if row[1] == "Main":
-                matches.append(row)
+        # skip empty or section‐header lines, need at least two columns,
+        # exact match on column B; only matching rows are kept
+        matches = [row for row in csv.reader(f)
+                   if len(row) > 1 and row[1] == "Main" and not row[0].startswith(':')]
 
     if not matches:
         sys.exit("❌ No rows with column B == \"Main\" found.")
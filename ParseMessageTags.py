@@ -1,7 +1,8 @@
 import os
 import glob
-import xml.etree.ElementTree as ET
-import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from lxml import etree
+from openpyxl import Workbook
 
 # PARAMETERS you can tweak:
 INPUT_DIR = r"C:\Users\dkelly\QCA Systems Ltd\CSX Curtis Bay Pier - Documents\Q-8690G - Site Wide Ignition Deployment\05 ENG AUTO\10 Conceptual\Program Exports"
@@ -20,46 +21,50 @@ PARAMS = [
 
 def parse_l5x_file(filepath):
     """
-    Parse one .L5X, return a DataFrame with one row per
-    <Data Format="Message"> found, columns = PARAMS.
+    Parse one .L5X, return a list of dicts (one per
+    <Data Format="Message"> found, keys = PARAMS).
     """
-    tree = ET.parse(filepath)
-    root = tree.getroot()
     records = []
 
-    # Namespace-agnostic tag matching:
-    def is_data_message(elem):
-        tag = elem.tag.split('}')[-1]
-        return tag == "Data" and elem.attrib.get("Format") == "Message"
-
-    for data in root.iter():
-        if is_data_message(data):
-            mp = data.find('.//MessageParameters')
+    # Stream <Data> plus the <Tag>/<Rung> elements around it (namespace-agnostic)
+    # and free each one, with its handled siblings, as it closes:
+    for _, elem in etree.iterparse(filepath, events=("end",),
+                                   tag=("{*}Data", "{*}Tag", "{*}Rung"), recover=True):
+        if etree.QName(elem).localname == "Data" and elem.get("Format") == "Message":
+            mp = elem.find('.//{*}MessageParameters')
             if mp is not None:
                 # pull each attribute (None if missing)
-                row = {p: mp.attrib.get(p) for p in PARAMS}
+                row = {p: mp.get(p) for p in PARAMS}
                 records.append(row)
+        elem.clear(keep_tail=True)
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
 
-    return pd.DataFrame(records)
+    return records
 
 def build_message_workbook(input_dir, output_file):
     """
     Scans input_dir for .L5X files and writes an Excel workbook
     with one sheet per file (named after the file, truncated to 31 chars).
     """
-    writer = pd.ExcelWriter(output_file, engine="openpyxl")
+    # Files are independent, so parse them in parallel; writing stays serial:
+    paths = sorted(glob.glob(os.path.join(input_dir, "*.L5X")))
+    with ProcessPoolExecutor() as ex:
+        per_file = list(ex.map(parse_l5x_file, paths))
+
+    # Write-only workbook streams rows to disk instead of holding every cell:
+    wb = Workbook(write_only=True)
 
-    for fullpath in glob.glob(os.path.join(input_dir, "*.L5X")):
-        df = parse_l5x_file(fullpath)
+    for fullpath, rows in zip(paths, per_file):
         # Sheet names max out at 31 chars:
         sheet_name = os.path.splitext(os.path.basename(fullpath))[0][:31]
-        # if no messages found, write an empty sheet with headers:
-        if df.empty:
-            df = pd.DataFrame(columns=PARAMS)
-        df.to_excel(writer, sheet_name=sheet_name, index=False)
+        ws = wb.create_sheet(sheet_name)
+        # if no messages found, this leaves an empty sheet with headers:
+        ws.append(PARAMS)
+        for row in rows:
+            ws.append([row.get(p) for p in PARAMS])
 
-    # writer.save()
-    writer.close()
+    wb.save(output_file)
     print(f"Wrote results to {output_file!r}")
 
 if __name__ == "__main__":
@@ -1,7 +1,8 @@
 import os
 import glob
-import xml.etree.ElementTree as ET
-import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from lxml import etree
+from openpyxl import Workbook
 
 # PARAMETERS you can tweak:
 INPUT_DIR = r"C:\Users\dkelly\QCA Systems Ltd\CSX Curtis Bay Pier - Documents\Q-8690G - Site Wide Ignition Deployment\05 ENG AUTO\10 Conceptual\Program Exports"
@@ -22,60 +23,60 @@ PARAMS = [
 
 def parse_l5x_file(filepath):
     """
-    Parse one .L5X, return a DataFrame with one row per
-    <Data Format="Message"> found, columns = PARAMS.
+    Parse one .L5X, return a list of dicts (one per
+    <Data Format="Message"> found, keys = PARAMS).
     """
-    try: 
-        tree = ET.parse(filepath)
-        root = tree.getroot()
-    except ET.ParseError as e:
+    records = []
+    # Stream <Data> plus the <Tag>/<Rung> elements around it (namespace-agnostic)
+    # and free each one, with its handled siblings, as it closes:
+    try:
+        for _, elem in etree.iterparse(filepath, events=("end",),
+                                       tag=("{*}Data", "{*}Tag", "{*}Rung"), recover=True):
+            if etree.QName(elem).localname == "Data" and elem.get("Format") == "Message":
+                # find() stops at the first match instead of walking the whole subtree
+                mp = elem.find('.//{*}MessageParameters')
+                if mp is not None:
+                    # pull each attribute (None if missing)
+                    row = {p: mp.get(p) for p in PARAMS}
+                    row["SourceFile"] = os.path.basename(filepath)
+                    records.append(row)
+            elem.clear(keep_tail=True)
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+    except etree.XMLSyntaxError as e:
         print(f"[WARN] SKipping {filepath}: XML parse erraor: {e}")
         return []
-    records = []
-    # Namespace-agnostic tag matching:
-    def localname(elem):
-       return elem.split('}',1)[-1]
-    for data in root.iter():
-        if localname(data.tag) == "Data" and data.attrib.get("Format") == "Message":
-            mp = None
-            for child in data.iter():
-                if localname(child.tag) == "MessageParameters":
-                    mp = child
-                    break
-            if mp is not None:
-                # pull each attribute (None if missing)
-                row = {p: mp.attrib.get(p) for p in PARAMS}
-                row["Sourse File"] = os.path.basename(filepath)
-                records.append(row)
     # print(f"{records}")
-    return pd.DataFrame(records)
+    return records
 
 def build_message_workbook(input_dir, output_file):
     """
     Scans input_dir for .L5X files and writes an Excel workbook
     with one sheet per file (named after the file, truncated to 31 chars).
     """
+    # Files are independent, so parse them in parallel; writing stays serial:
+    paths = sorted(glob.glob(os.path.join(input_dir, "*.L5X")))
+    with ProcessPoolExecutor() as ex:
+        per_file = list(ex.map(parse_l5x_file, paths))
+
     allRows = []
-    #writer = pd.ExcelWriter(output_file, engine="openpyxl")
 
-    for fullpath in glob.glob(os.path.join(input_dir, "*.L5X")):
-        rows = parse_l5x_file(fullpath)
-        if not rows.empty:
+    for fullpath, rows in zip(paths, per_file):
+        if rows:
             allRows.extend(rows)
         else:
             print(f'Skipping file: {fullpath}')
     print(f"{allRows}")
-    if allRows:
-        df = pd.DataFrame(allRows, columns = PARAMS)
-    else: 
-    # if no messages found, write an empty sheet with headers:
-        df = pd.DataFrame(columns=PARAMS)
 
-    with pd.ExcelWriter(output_file, engine="openpyxl") as writer:
-        df.to_excel(writer, sheet_name=sheet_name, index=False)
-    # writer.save()
-    writer.close()
-    print(f"Wrote results to {output_file!r} total of {len(df)}")
+    # Write-only workbook streams rows to disk instead of holding every cell;
+    # if no messages found, this is an empty sheet with headers:
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet_name)
+    ws.append(PARAMS)
+    for row in allRows:
+        ws.append([row.get(p) for p in PARAMS])
+    wb.save(output_file)
+    print(f"Wrote results to {output_file!r} total of {len(allRows)}")
 
 if __name__ == "__main__":
     build_message_workbook(INPUT_DIR, OUTPUT_FILE)
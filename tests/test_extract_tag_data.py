@@ -0,0 +1,67 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("openpyxl")
+pytest.importorskip("lxml")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import ExtractTagData  # noqa: E402
+
+COLS = ["Col45", "Description", "DataType", "Program", "Routine", "Rung", "Instruction", "Source"]
+
+# Add-On Instruction logic sits ahead of the controller <Tags> in an L5X
+AOI_L5X = """<?xml version="1.0" encoding="UTF-8"?>
+<RSLogix5000Content SchemaRevision="1.0">
+<Controller Name="C">
+<AddOnInstructionDefinitions>
+<AddOnInstructionDefinition Name="MyAOI"><Parameters/><LocalTags/><Routines>
+<Routine Name="Logic" Type="RLL"><RLLContent>
+<Rung Number="0" Type="N"><Text><![CDATA[MOV(x,Arr[3]);COP(a[0],Arr[10],5);FFL(s,Arr[20],Ctl,8,0);OTE(DW[2].3);MSG(M);]]></Text>
+<Data><MessageParameters LocalElement="MX[1]" RequestedLength="2" RemoteElement="RMT[4]"/></Data></Rung>
+</RLLContent></Routine></Routines></AddOnInstructionDefinition>
+</AddOnInstructionDefinitions>
+<Tags>
+<Tag Name="Arr" DataType="INT" Dimensions="40"><Description><![CDATA[AOI target]]></Description></Tag>
+<Tag Name="Ctl" DataType="CONTROL"><Data Format="Decorated"><Structure DataType="CONTROL">
+<DataValueMember Name="LEN" DataType="DINT" Value="8"/></Structure></Data></Tag>
+<Tag Name="DW" DataType="DINT" Dimensions="10"/>
+<Tag Name="MX" DataType="INT" Dimensions="10"><Description><![CDATA[Msg buffer]]></Description></Tag>
+</Tags>
+<Programs/>
+</Controller>
+</RSLogix5000Content>
+"""
+
+
+def test_aoi_rungs_ahead_of_tags_get_tag_metadata(tmp_path):
+    tags = ["Arr[3]", "Arr[10]", "Arr[11]", "Arr[12]", "Arr[14]", "Arr[20]", "Arr[27]", "Arr[28]",
+            "DW[2]", "MX[1]", "MX[2]", "NOPE"]
+    excel = tmp_path / "tags.xlsx"
+    pd.DataFrame({"Col1": ["x"] * len(tags), "Col45": tags}).to_excel(excel, index=False)
+    l5x = tmp_path / "aoi.L5X"
+    l5x.write_text(AOI_L5X, encoding="utf-8")
+    out = tmp_path / "out.xlsx"
+
+    ExtractTagData.extract_mappings(excel, l5x, out)
+
+    aoi = ["MyAOI", "Logic", "0"]
+    want = pd.DataFrame([
+        ["Arr[3]",  "AOI target", "INT",  *aoi, "MOV",       "x"],
+        ["Arr[10]", "AOI target", "INT",  *aoi, "COP",       "a[0]"],
+        ["Arr[11]", "AOI target", "INT",  *aoi, "COP",       "a[1]"],
+        ["Arr[12]", "AOI target", "INT",  *aoi, "COP",       "a[2]"],
+        ["Arr[14]", "AOI target", "INT",  *aoi, "COP",       "a[4]"],
+        ["Arr[20]", "AOI target", "INT",  *aoi, "FFL",       "s"],
+        ["Arr[27]", "AOI target", "INT",  *aoi, "FFL",       "s"],
+        ["Arr[28]", "AOI target", "INT",  "", "", "", "Not Found", ""],
+        ["DW[2].3", "",           "DINT", *aoi, "OTE",       ""],
+        ["MX[1]",   "Msg buffer", "INT",  *aoi, "MESSAGE",   "RMT[4]"],
+        ["MX[2]",   "Msg buffer", "INT",  *aoi, "MESSAGE",   "RMT[5]"],
+        ["NOPE",    "",           "",     "", "", "", "Not Found", ""],
+    ], columns=COLS)
+
+    got = pd.read_excel(out, sheet_name="Tag Mapping", dtype=str, keep_default_na=False)
+    pd.testing.assert_frame_equal(got, want)
@@ -0,0 +1,73 @@
+import csv
+import sys
+from pathlib import Path
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("openpyxl")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import ParseMainTopicFromTags  # noqa: E402
+
+
+def reference_rows(path):
+    """Original csv.reader filter: rows with column B == "Main", padded with ""."""
+    matches = []
+    with path.open(newline='', encoding='utf-8', errors='replace') as f:
+        for row in csv.reader(f):
+            if not row or row[0].startswith(':'):
+                continue
+            if len(row) < 2:
+                continue
+            if row[1] == "Main":
+                matches.append(row)
+    max_cols = max(len(r) for r in matches)
+    cols = [f"Col{i+1}" for i in range(max_cols)]
+    return pd.DataFrame([r + [""]*(max_cols - len(r)) for r in matches], columns=cols)
+
+
+def run_main(tmp_path, monkeypatch, text):
+    src = tmp_path / "export.csv"
+    src.write_text(text, encoding="utf-8", newline="")
+    out = tmp_path / "out.xlsx"
+    monkeypatch.setattr(ParseMainTopicFromTags, "INPUT_FILE", src)
+    monkeypatch.setattr(ParseMainTopicFromTags, "OUTPUT_FILE", out)
+    ParseMainTopicFromTags.main()
+    got = pd.read_excel(out, dtype=str, keep_default_na=False)
+    return got, reference_rows(src)
+
+
+def test_width_follows_matched_rows_not_widest_line(tmp_path, monkeypatch):
+    text = (
+        ":IODisc,Group,Comment\n"
+        "A1,Main,x\n"
+        ":IOInt,Group,Comment,Min,Max\n"
+        "B1,Main,,0,100\n"
+        "C1,Other,a,b,c,d,e,f\n"
+    )
+    got, want = run_main(tmp_path, monkeypatch, text)
+    assert got.columns.tolist() == ["Col1", "Col2", "Col3", "Col4", "Col5"]
+    pd.testing.assert_frame_equal(got, want)
+
+
+def test_matches_csv_reader_on_quotes_blanks_and_trailing_empties(tmp_path, monkeypatch):
+    text = (
+        ":mode=ask\n"
+        ":IODisc,Group,Comment,Logged\n"
+        'A1,Main,"hello, world",No\n'
+        "\n"
+        "B1,Other,x,y,z,z,z,z,z,z\n"
+        'C1,Main,"two\nlines",No,,\n'
+        'C2,Main,"multi ""quoted""",No\n'
+        "E1\n"
+        "F1,Main\n"
+        ":Main,Main,header\n"
+    )
+    got, want = run_main(tmp_path, monkeypatch, text)
+    pd.testing.assert_frame_equal(got, want)
+
+
+def test_no_main_rows_exits(tmp_path, monkeypatch):
+    with pytest.raises(SystemExit):
+        run_main(tmp_path, monkeypatch, "A1,Other\nB1\n")